@@ -0,0 +1,198 @@
+"""Offline bulk conversion of timestamp files to cycle positions.
+
+Uses the same CycleCalculator math as the API, reads CSV or Parquet input in
+chunks and converts them on all cores, so memory stays constant for any input size.
+
+    python cli.py convert events.parquet phases.parquet -c solar_year -c lunar_month
+    python cli.py cycles
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import typer
+
+from server import PRESET_CYCLES, EPHEMERIS_CYCLES, CycleCalculator, find_preset, get_zone, is_valid_zone
+
+cli = typer.Typer(help="SiNo cycle phase conversion tools")
+
+
+def cycle_slug(cycle: Dict) -> str:
+    return cycle['name'].lower().replace(' ', '_')
+
+
+# Explicit offset after the time part, e.g. Z, +01:00, -0500
+OFFSET_PATTERN = r'[T ]\d.*(?:[Zz]|[+-]\d{2}(?::?\d{2})?)$'
+UNIX_EPOCH = pd.Timestamp(0, tz='UTC')
+
+
+def localize_naive(naive: pd.Series, tz: str) -> pd.Series:
+    """UTC datetimes of wall clock times in tz, resolved like CycleCalculator.parse_datetime.
+
+    ZoneInfo (fold=0) takes the first occurrence of ambiguous times and the offset
+    before the transition for times in a DST gap, pandas has no such mode.
+    """
+    utc = naive.dt.tz_localize(tz, ambiguous='NaT', nonexistent='NaT').dt.tz_convert('UTC')
+    edge = (utc.isna() & naive.notna()).to_numpy()
+    if edge.any():  # only rows around DST changes, so element-wise is fine
+        zone = get_zone(tz)
+        utc[edge] = [pd.Timestamp(ts.to_pydatetime().replace(tzinfo=zone)).tz_convert('UTC') for ts in naive[edge]]
+    return utc
+
+
+def parse_timestamps(timestamps: pd.Series, tz: Optional[str]) -> pd.Series:
+    """UTC datetimes of ISO timestamps, naive values are wall clock times in tz (UTC by default)"""
+    if pd.api.types.is_datetime64_any_dtype(timestamps):  # typed Parquet column
+        if timestamps.dt.tz is not None:
+            return timestamps.dt.tz_convert('UTC')
+        return localize_naive(timestamps, tz) if tz is not None else timestamps.dt.tz_localize('UTC')
+
+    parsed = pd.to_datetime(timestamps, errors='coerce', utc=True, format='ISO8601')
+    if tz is not None:
+        # Rows may mix offsets (DST exports) and naive values, so localize the naive ones separately
+        text = timestamps.astype('string').str.strip()
+        naive = ~text.str.contains(OFFSET_PATTERN, regex=True).fillna(False).to_numpy(dtype=bool)
+        if naive.any():
+            parsed[naive] = localize_naive(pd.to_datetime(text[naive], errors='coerce', format='ISO8601'), tz)
+    return parsed
+
+
+def convert_chunk(timestamps: pd.Series, cycle_names: List[str], tz: Optional[str], cycle_px: int) -> pd.DataFrame:
+    """Phase, quadrant and pixel columns for one chunk of timestamps (runs in a worker process)"""
+    parsed = parse_timestamps(timestamps, tz)
+    valid = parsed.notna().to_numpy()
+    # Independent of the datetime resolution pandas picked (ns, us, s)
+    utc_seconds = ((parsed[valid] - UNIX_EPOCH) / pd.Timedelta(seconds=1)).to_numpy(dtype=float)
+
+    columns = {}
+    for cycle_name in cycle_names:
+        cycle = find_preset(cycle_name)
+        slug = cycle_slug(cycle)
+        positions = CycleCalculator.positions(utc_seconds, cycle, cycle_px, tz)
+
+        phase = np.full(len(valid), np.nan)
+        pixel_x = np.full(len(valid), np.nan)
+        quadrant = pd.array([pd.NA] * len(valid), dtype='Int8')
+        phase[valid] = positions['phase_percent']
+        pixel_x[valid] = positions['pixel_x']
+        quadrant[valid] = positions['quadrant']
+
+        columns[f"{slug}_phase"] = phase
+        columns[f"{slug}_quadrant"] = quadrant
+        columns[f"{slug}_pixel_x"] = pixel_x
+    return pd.DataFrame(columns, index=timestamps.index)
+
+
+def process_chunk(chunk: pd.DataFrame, column: str, cycle_names: List[str], tz: Optional[str],
+                  cycle_px: int, keep_columns: bool, as_csv: bool, header: bool):
+    """Convert one input chunk, CSV output is also rendered in the worker as it dominates the cost"""
+    frame = pd.concat([chunk if keep_columns else chunk[[column]],
+                       convert_chunk(chunk[column], cycle_names, tz, cycle_px)], axis=1)
+    if as_csv:
+        return frame.to_csv(index=False, header=header)
+    return frame
+
+
+def read_chunks(path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+    if path.suffix.lower() == '.parquet':
+        pq = _require_pyarrow()
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    """Append converted chunks to a Parquet file (data frames) or CSV file (rendered text)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.parquet = path.suffix.lower() == '.parquet'
+        self.writer = None
+
+    def write(self, data):
+        if self.parquet:
+            pq = _require_pyarrow()
+            import pyarrow as pa
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+        else:
+            if self.writer is None:
+                self.writer = open(self.path, 'w', newline='')
+            self.writer.write(data)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise typer.BadParameter("Parquet files need the pyarrow package")
+    return pq
+
+
+@cli.command()
+def convert(
+    input_path: Path = typer.Argument(..., exists=True, dir_okay=False, help="CSV or Parquet input"),
+    output_path: Path = typer.Argument(..., dir_okay=False, help="CSV or Parquet output (by suffix)"),
+    cycle: List[str] = typer.Option(..., "--cycle", "-c", help="Cycle name, e.g. solar_year (repeatable)"),
+    column: str = typer.Option("timestamp", help="Input column with ISO timestamps"),
+    tz: Optional[str] = typer.Option(None, help="IANA zone for naive timestamps and local cycles"),
+    chunk_size: int = typer.Option(200_000, min=1, help="Rows per chunk"),
+    workers: int = typer.Option(os.cpu_count() or 1, min=1, help="Worker processes"),
+    cycle_px: int = typer.Option(1460, min=1, help="Pixel width of one cycle"),
+    keep_columns: bool = typer.Option(True, help="Copy input columns to the output"),
+):
+    """Add phase, quadrant and pixel_x columns for every cycle to a timestamp file"""
+    for cycle_name in cycle:
+        if find_preset(cycle_name) is None:
+            raise typer.BadParameter(f"Cycle not found: {cycle_name}", param_hint="--cycle")
+    if not is_valid_zone(tz):
+        raise typer.BadParameter(f"Unknown timezone: {tz}", param_hint="--tz")
+
+    writer = ChunkWriter(output_path)
+    rows = 0
+    # Keep at most two chunks per worker in flight so memory does not grow with the input
+    max_pending = workers * 2
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = []
+            for chunk in read_chunks(input_path, chunk_size):
+                if column not in chunk:
+                    raise typer.BadParameter(f"Column not found: {column}", param_hint="--column")
+                first = rows == 0 and not pending
+                pending.append((len(chunk), executor.submit(
+                    process_chunk, chunk, column, cycle, tz, cycle_px, keep_columns, not writer.parquet, first
+                )))
+                if len(pending) >= max_pending:
+                    rows += _write_next(pending, writer)
+            while pending:
+                rows += _write_next(pending, writer)
+    finally:
+        writer.close()
+    typer.echo(f"Converted {rows} rows to {output_path}")
+
+
+def _write_next(pending: list, writer: ChunkWriter) -> int:
+    size, future = pending.pop(0)
+    writer.write(future.result())
+    return size
+
+
+@cli.command()
+def cycles():
+    """List available cycle names"""
+    for preset in PRESET_CYCLES + EPHEMERIS_CYCLES:
+        typer.echo(f"{cycle_slug(preset):<20} {preset['description']}")
+
+
+if __name__ == "__main__":
+    cli()
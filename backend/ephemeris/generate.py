@@ -0,0 +1,200 @@
+"""Generate ephemeris tables for true (non-mean) cycle boundaries.
+
+Each table is a flat little-endian float64 array of UTC unix timestamps,
+four events per cycle period starting with quadrant 0:
+
+    lunar_phases.f8  new moon, first quarter, full moon, last quarter
+    seasons.f8       March equinox, June solstice, September equinox, December solstice
+
+Algorithms from Jean Meeus, Astronomical Algorithms (2nd ed.), chapters 27 and 49.
+Instants are accurate to about a minute, ΔT uses the Espenak & Meeus polynomials.
+
+Usage: python backend/ephemeris/generate.py [start_year] [end_year]
+"""
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+EPHEMERIS_DIR = Path(__file__).parent
+START_YEAR = 1900
+END_YEAR = 2100
+
+UNIX_EPOCH_JD = 2440587.5
+
+
+def sin_d(degrees):
+    return math.sin(math.radians(degrees))
+
+
+def cos_d(degrees):
+    return math.cos(math.radians(degrees))
+
+
+def delta_t(year):
+    """ΔT = TD - UT in seconds (Espenak & Meeus)"""
+    if year < 1920:
+        t = year - 1900
+        return -2.79 + 1.494119 * t - 0.0598939 * t**2 + 0.0061966 * t**3 - 0.000197 * t**4
+    if year < 1941:
+        t = year - 1920
+        return 21.20 + 0.84493 * t - 0.076100 * t**2 + 0.0020936 * t**3
+    if year < 1961:
+        t = year - 1950
+        return 29.07 + 0.407 * t - t**2 / 233 + t**3 / 2547
+    if year < 1986:
+        t = year - 1975
+        return 45.45 + 1.067 * t - t**2 / 260 - t**3 / 718
+    if year < 2005:
+        t = year - 2000
+        return (63.86 + 0.3345 * t - 0.060374 * t**2 + 0.0017275 * t**3
+                + 0.000651814 * t**4 + 0.00002373599 * t**5)
+    if year < 2050:
+        t = year - 2000
+        return 62.92 + 0.32217 * t + 0.005589 * t**2
+    return -20 + 32 * ((year - 1820) / 100) ** 2 - 0.5628 * (2150 - year)
+
+
+def jde_to_unix(jde):
+    """Julian Ephemeris Day (TD) to UTC unix seconds"""
+    year = 2000 + (jde - 2451545.0) / 365.25
+    return (jde - UNIX_EPOCH_JD) * 86400 - delta_t(year)
+
+
+# Chapter 49, periodic terms as (coefficient, power of E, M', M, F, Ω multipliers)
+NEW_MOON_TERMS = [
+    (-0.40720, 0, 1, 0, 0, 0), (0.17241, 1, 0, 1, 0, 0), (0.01608, 0, 2, 0, 0, 0),
+    (0.01039, 0, 0, 0, 2, 0), (0.00739, 1, 1, -1, 0, 0), (-0.00514, 1, 1, 1, 0, 0),
+    (0.00208, 2, 0, 2, 0, 0), (-0.00111, 0, 1, 0, -2, 0), (-0.00057, 0, 1, 0, 2, 0),
+    (0.00056, 1, 2, 1, 0, 0), (-0.00042, 0, 3, 0, 0, 0), (0.00042, 1, 0, 1, 2, 0),
+    (0.00038, 1, 0, 1, -2, 0), (-0.00024, 1, 2, -1, 0, 0), (-0.00017, 0, 0, 0, 0, 1),
+    (-0.00007, 0, 1, 2, 0, 0), (0.00004, 0, 2, 0, -2, 0), (0.00004, 0, 0, 3, 0, 0),
+    (0.00003, 0, 1, 1, -2, 0), (0.00003, 0, 2, 0, 2, 0), (-0.00003, 0, 1, 1, 2, 0),
+    (0.00003, 0, 1, -1, 2, 0), (-0.00002, 0, 1, -1, -2, 0), (-0.00002, 0, 3, 1, 0, 0),
+    (0.00002, 0, 4, 0, 0, 0),
+]
+
+FULL_MOON_TERMS = [
+    (-0.40614, 0, 1, 0, 0, 0), (0.17302, 1, 0, 1, 0, 0), (0.01614, 0, 2, 0, 0, 0),
+    (0.01043, 0, 0, 0, 2, 0), (0.00734, 1, 1, -1, 0, 0), (-0.00515, 1, 1, 1, 0, 0),
+    (0.00209, 2, 0, 2, 0, 0), (-0.00111, 0, 1, 0, -2, 0), (-0.00057, 0, 1, 0, 2, 0),
+    (0.00056, 1, 2, 1, 0, 0), (-0.00042, 0, 3, 0, 0, 0), (0.00042, 1, 0, 1, 2, 0),
+    (0.00038, 1, 0, 1, -2, 0), (-0.00024, 1, 2, -1, 0, 0), (-0.00017, 0, 0, 0, 0, 1),
+    (-0.00007, 0, 1, 2, 0, 0), (0.00004, 0, 2, 0, -2, 0), (0.00004, 0, 0, 3, 0, 0),
+    (0.00003, 0, 1, 1, -2, 0), (0.00003, 0, 2, 0, 2, 0), (-0.00003, 0, 1, 1, 2, 0),
+    (0.00003, 0, 1, -1, 2, 0), (-0.00002, 0, 1, -1, -2, 0), (-0.00002, 0, 3, 1, 0, 0),
+    (0.00002, 0, 4, 0, 0, 0),
+]
+
+QUARTER_TERMS = [
+    (-0.62801, 0, 1, 0, 0, 0), (0.17172, 1, 0, 1, 0, 0), (-0.01183, 1, 1, 1, 0, 0),
+    (0.00862, 0, 2, 0, 0, 0), (0.00804, 0, 0, 0, 2, 0), (0.00454, 1, 1, -1, 0, 0),
+    (0.00204, 2, 0, 2, 0, 0), (-0.00180, 0, 1, 0, -2, 0), (-0.00070, 0, 1, 0, 2, 0),
+    (-0.00040, 0, 3, 0, 0, 0), (-0.00034, 1, 2, -1, 0, 0), (0.00032, 1, 0, 1, 2, 0),
+    (0.00032, 1, 0, 1, -2, 0), (-0.00028, 2, 1, 2, 0, 0), (0.00027, 1, 2, 1, 0, 0),
+    (-0.00017, 0, 0, 0, 0, 1), (-0.00005, 0, 1, -1, -2, 0), (0.00004, 0, 2, 0, 2, 0),
+    (-0.00004, 0, 1, 1, 2, 0), (0.00004, 0, 1, -2, 0, 0), (0.00003, 0, 1, 1, -2, 0),
+    (0.00003, 0, 0, 3, 0, 0), (0.00002, 0, 2, 0, -2, 0), (0.00002, 0, 1, -1, 2, 0),
+    (-0.00002, 0, 3, 1, 0, 0),
+]
+
+# Additional corrections for all phases as (coefficient, A0, A per k, A per T²)
+PLANETARY_TERMS = [
+    (0.000325, 299.77, 0.107408, -0.009173), (0.000165, 251.88, 0.016321, 0),
+    (0.000164, 251.83, 26.651886, 0), (0.000126, 349.42, 36.412478, 0),
+    (0.000110, 84.66, 18.206239, 0), (0.000062, 141.74, 53.303771, 0),
+    (0.000060, 207.14, 2.453732, 0), (0.000056, 154.84, 7.306860, 0),
+    (0.000047, 34.52, 27.261239, 0), (0.000042, 207.19, 0.121824, 0),
+    (0.000040, 291.34, 1.844379, 0), (0.000037, 161.72, 24.198154, 0),
+    (0.000035, 239.56, 25.513099, 0), (0.000023, 331.55, 3.592518, 0),
+]
+
+
+def moon_phase_jde(k):
+    """JDE of the lunar phase k (integer new moon, +0.25 first quarter, +0.5 full, +0.75 last quarter)"""
+    t = k / 1236.85
+    jde = (2451550.09766 + 29.530588861 * k + 0.00015437 * t**2
+           - 0.000000150 * t**3 + 0.00000000073 * t**4)
+    e = 1 - 0.002516 * t - 0.0000074 * t**2
+    m = 2.5534 + 29.10535670 * k - 0.0000014 * t**2 - 0.00000011 * t**3
+    mp = (201.5643 + 385.81693528 * k + 0.0107582 * t**2
+          + 0.00001238 * t**3 - 0.000000058 * t**4)
+    f = (160.7108 + 390.67050284 * k - 0.0016118 * t**2
+         - 0.00000227 * t**3 + 0.000000011 * t**4)
+    omega = 124.7746 - 1.56375588 * k + 0.0020672 * t**2 + 0.00000215 * t**3
+
+    phase = round((k % 1) * 4) % 4
+    terms = {0: NEW_MOON_TERMS, 2: FULL_MOON_TERMS}.get(phase, QUARTER_TERMS)
+    for coefficient, e_power, n_mp, n_m, n_f, n_omega in terms:
+        jde += coefficient * e**e_power * sin_d(n_mp * mp + n_m * m + n_f * f + n_omega * omega)
+
+    if phase in (1, 3):
+        w = (0.00306 - 0.00038 * e * cos_d(m) + 0.00026 * cos_d(mp)
+             - 0.00002 * cos_d(mp - m) + 0.00002 * cos_d(mp + m) + 0.00002 * cos_d(2 * f))
+        jde += w if phase == 1 else -w
+
+    for coefficient, a0, a_k, a_t2 in PLANETARY_TERMS:
+        jde += coefficient * sin_d(a0 + a_k * k + a_t2 * t**2)
+    return jde
+
+
+# Chapter 27, mean equinox/solstice polynomials in Y = (year - 2000) / 1000
+SEASON_POLYNOMIALS = [
+    (2451623.80984, 365242.37404, 0.05169, -0.00411, -0.00057),  # March equinox
+    (2451716.56767, 365241.62603, 0.00325, 0.00888, -0.00030),   # June solstice
+    (2451810.21715, 365242.01767, -0.11575, 0.00337, 0.00078),   # September equinox
+    (2451900.05952, 365242.74049, -0.06223, -0.00823, 0.00032),  # December solstice
+]
+
+SEASON_TERMS = [
+    (485, 324.96, 1934.136), (203, 337.23, 32964.467), (199, 342.08, 20.186),
+    (182, 27.85, 445267.112), (156, 73.14, 45036.886), (136, 171.52, 22518.443),
+    (77, 222.54, 65928.934), (74, 296.72, 3034.906), (70, 243.58, 9037.513),
+    (58, 119.81, 33718.147), (52, 297.17, 150.678), (50, 21.02, 2281.226),
+    (45, 247.54, 29929.562), (44, 325.15, 31555.956), (29, 60.93, 4443.417),
+    (18, 155.12, 67555.328), (17, 288.79, 4562.452), (16, 198.04, 62894.029),
+    (14, 199.76, 31436.921), (12, 95.39, 14577.848), (12, 287.11, 31931.756),
+    (12, 320.81, 34777.259), (9, 227.73, 1222.114), (8, 15.45, 16859.074),
+]
+
+
+def season_jde(year, season):
+    """JDE of the March equinox (0), June solstice (1), September equinox (2) or December solstice (3)"""
+    y = (year - 2000) / 1000
+    c0, c1, c2, c3, c4 = SEASON_POLYNOMIALS[season]
+    jde0 = c0 + c1 * y + c2 * y**2 + c3 * y**3 + c4 * y**4
+    t = (jde0 - 2451545.0) / 36525
+    w = 35999.373 * t - 2.47
+    delta_lambda = 1 + 0.0334 * cos_d(w) + 0.0007 * cos_d(2 * w)
+    s = sum(a * cos_d(b + c * t) for a, b, c in SEASON_TERMS)
+    return jde0 + 0.00001 * s / delta_lambda
+
+
+def lunar_phases(start_year, end_year):
+    k = math.floor((start_year - 2000) * 12.3685)
+    end_k = math.ceil((end_year - 2000) * 12.3685)
+    return [jde_to_unix(moon_phase_jde(k + quarter / 4))
+            for k in range(k, end_k + 1) for quarter in range(4)]
+
+
+def seasons(start_year, end_year):
+    return [jde_to_unix(season_jde(year, season))
+            for year in range(start_year, end_year + 1) for season in range(4)]
+
+
+def write_table(path, instants):
+    table = np.array(instants, dtype='<f8')
+    if not np.all(np.diff(table) > 0):
+        raise ValueError(f"{path.name}: instants are not strictly increasing")
+    table.tofile(path)
+    print(f"{path.name}: {len(table)} events")
+
+
+def main(start_year=START_YEAR, end_year=END_YEAR):
+    write_table(EPHEMERIS_DIR / 'lunar_phases.f8', lunar_phases(start_year, end_year))
+    write_table(EPHEMERIS_DIR / 'seasons.f8', seasons(start_year, end_year))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -1,15 +1,26 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from pydantic import BaseModel, Field, ValidationError
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
 import uuid
-from datetime import datetime, timedelta
+import json
+import hashlib
+import base64
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+import bisect
 import math
+import numpy as np
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -36,6 +47,8 @@ class CyclePreset(BaseModel):
     base_stroke: float = 4.0
     color: str = "#FFC107"
     description: str = ""
+    timezone: Optional[str] = None  # IANA zone, "local" for the request zone, None for UTC
+    ephemeris: Optional[str] = None  # table of true quadrant boundaries, see EPHEMERIS_TABLES
 
 class CycleCreate(BaseModel):
     name: str
@@ -46,10 +59,14 @@ class CycleCreate(BaseModel):
     base_stroke: float = 4.0
     color: str = "#FFC107"
     description: str = ""
+    timezone: Optional[str] = None
+    ephemeris: Optional[str] = None
 
 class TimePosition(BaseModel):
     datetime_iso: str
     cycle_id: str
+    timezone: Optional[str] = None  # IANA zone for naive datetimes and local cycles
+    quantize: bool = False  # snap to the cycle's unit_seconds and serve from cache
 
 class PositionResponse(BaseModel):
     pixel_x: float
@@ -57,6 +74,17 @@ class PositionResponse(BaseModel):
     quadrant: int
     quadrant_progress: float
 
+class SweepRequest(BaseModel):
+    dates: List[str]  # reference dates
+    target_phases: List[float]  # expected phase per date in percent (0-100)
+    period_days: List[float]  # candidate values, the grid is their cartesian product
+    epochs: List[str]
+    quadrant_ratios: List[List[int]] = [[1, 1, 1, 1]]
+    metric: str = "wave"  # "wave": position on the drawn wave, "phase": time fraction of the period
+    timezone: Optional[str] = None  # zone for naive dates and epochs
+    top: int = 10
+    include_scores: bool = False
+
 # Preset cycles data
 PRESET_CYCLES = [
     {
@@ -107,7 +135,8 @@ PRESET_CYCLES = [
         "unit_seconds": 3600,  # 1 hour
         "base_stroke": 2.5,
         "color": "#10B981",
-        "description": "24 hour solar day"
+        "description": "24 hour solar day",
+        "timezone": "local"  # sunrise in the viewer's zone
     },
     {
         "name": "Hour",
@@ -121,24 +150,213 @@ PRESET_CYCLES = [
     }
 ]
 
+# Cycles with true boundaries from ephemeris tables, epochs are the true events of 2000
+EPHEMERIS_CYCLES = [
+    {
+        "name": "True Solar Year",
+        "epoch": "2000-03-20T07:35:00Z",
+        "period_days": 365.2422,
+        "quadrant_ratios": [92, 93, 88, 89],
+        "unit_seconds": 86400,  # 1 day
+        "base_stroke": 4.0,
+        "color": "#F59E0B",
+        "description": "Tropical year between true equinoxes and solstices",
+        "ephemeris": "seasons"
+    },
+    {
+        "name": "True Lunar Month",
+        "epoch": "2000-01-06T18:14:00Z",
+        "period_days": 29.530589,
+        "quadrant_ratios": [7, 8, 7, 7],
+        "unit_seconds": 86400,  # 1 day
+        "base_stroke": 3.0,
+        "color": "#DB2777",
+        "description": "Synodic month between true new moons and lunar quarters",
+        "ephemeris": "lunar_phases"
+    }
+]
+
+def find_preset(cycle_name: str) -> Optional[Dict[str, Any]]:
+    """Find preset cycle by url name (e.g. 'solar_year')"""
+    for preset in PRESET_CYCLES + EPHEMERIS_CYCLES:
+        if preset['name'].lower().replace(' ', '_') == cycle_name.lower():
+            return preset
+    return None
+
+# Flat little-endian float64 UTC timestamps, four quadrant starts per period
+# starting with quadrant 0, generated by ephemeris/generate.py
+EPHEMERIS_DIR = ROOT_DIR / 'ephemeris'
+EPHEMERIS_TABLES = {
+    "lunar_phases": "lunar_phases.f8",  # new moon, first quarter, full moon, last quarter
+    "seasons": "seasons.f8",  # March equinox, June solstice, September equinox, December solstice
+}
+
+@lru_cache(maxsize=None)
+def load_ephemeris(name: str) -> np.ndarray:
+    """Memory-map an ephemeris table, pages are shared and loaded on demand"""
+    return np.memmap(EPHEMERIS_DIR / EPHEMERIS_TABLES[name], dtype='<f8', mode='r')
+
+@lru_cache(maxsize=None)
+def _ephemeris_epoch_period(name: str, epoch: str) -> int:
+    """Index of the table period containing the cycle epoch"""
+    table = load_ephemeris(name)
+    epoch_seconds = CycleCalculator.parse_datetime(epoch).timestamp()
+    return (int(np.searchsorted(table, epoch_seconds, side='right')) - 1) // 4
+
+TZ_TRANSITION_YEARS = (1900, 2100)  # transition tables cover this range, outside falls back to ZoneInfo
+
+# Zone caches are unbounded: there are only ~600 IANA zones and a table is a few
+# hundred floats, while rebuilding an evicted one takes tens of milliseconds
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+def is_valid_zone(name: Optional[str]) -> bool:
+    if name is None:
+        return True
+    try:
+        get_zone(name)
+    except (ValueError, KeyError):  # ZoneInfoNotFoundError is a KeyError
+        return False
+    return True
+
+def _zone_offset(zone: ZoneInfo, utc_seconds: float) -> float:
+    return datetime.fromtimestamp(utc_seconds, zone).utcoffset().total_seconds()
+
+@lru_cache(maxsize=None)
+def zone_transitions(name: str) -> Tuple[List[float], List[float]]:
+    """UTC instants where the zone offset changes and the offsets in effect.
+
+    offsets[i] applies before transitions[i] and offsets[i + 1] from it on.
+    """
+    zone = get_zone(name)
+    start = datetime(TZ_TRANSITION_YEARS[0], 1, 1, tzinfo=timezone.utc).timestamp()
+    end = datetime(TZ_TRANSITION_YEARS[1], 1, 1, tzinfo=timezone.utc).timestamp()
+
+    transitions = []
+    offsets = [_zone_offset(zone, start)]
+    t = start
+    # Offsets change at most a few times a year, scan daily and bisect each change to the second
+    while t < end:
+        next_t = min(t + 86400, end)
+        next_offset = _zone_offset(zone, next_t)
+        if next_offset != offsets[-1]:
+            lo, hi = int(t), int(next_t)
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if _zone_offset(zone, mid) == offsets[-1]:
+                    lo = mid
+                else:
+                    hi = mid
+            transitions.append(float(hi))
+            offsets.append(next_offset)
+        t = next_t
+    return transitions, offsets
+
+@lru_cache(maxsize=None)
+def _zone_transition_arrays(name: str) -> Tuple[np.ndarray, np.ndarray]:
+    transitions, offsets = zone_transitions(name)
+    return np.array(transitions, dtype=np.float64), np.array(offsets, dtype=np.float64)
+
+async def load_zone(name: Optional[str]) -> bool:
+    """Validate a request zone and build its transition tables in the threadpool.
+
+    Async handlers call this first so the daily scan never blocks the event loop.
+    """
+    if not is_valid_zone(name):
+        return False
+    if name is not None:
+        await run_in_threadpool(_zone_transition_arrays, name)
+    return True
+
+def _transition_range() -> Tuple[float, float]:
+    return (
+        datetime(TZ_TRANSITION_YEARS[0], 1, 1, tzinfo=timezone.utc).timestamp(),
+        datetime(TZ_TRANSITION_YEARS[1], 1, 1, tzinfo=timezone.utc).timestamp(),
+    )
+
+def local_seconds(utc_seconds: float, zone_name: Optional[str]) -> float:
+    """Wall clock seconds of a UTC instant in zone (identity for UTC)"""
+    if zone_name is None:
+        return utc_seconds
+    lo, hi = _transition_range()
+    if not lo <= utc_seconds < hi:
+        return utc_seconds + _zone_offset(get_zone(zone_name), utc_seconds)
+    transitions, offsets = zone_transitions(zone_name)
+    return utc_seconds + offsets[bisect.bisect_right(transitions, utc_seconds)]
+
+def local_seconds_array(utc_seconds: np.ndarray, zone_name: Optional[str]) -> np.ndarray:
+    """Vectorized local_seconds using a binary search over the cached transition table"""
+    if zone_name is None:
+        return utc_seconds
+    transitions, offsets = _zone_transition_arrays(zone_name)
+    shifted = utc_seconds + offsets[np.searchsorted(transitions, utc_seconds, side='right')]
+    lo, hi = _transition_range()
+    outside = (utc_seconds < lo) | (utc_seconds >= hi)
+    if outside.any():
+        zone = get_zone(zone_name)
+        shifted[outside] = [t + _zone_offset(zone, t) for t in utc_seconds[outside]]
+    return shifted
+
+def resolve_cycle_zone(cycle: Dict[str, Any], tz: Optional[str] = None) -> Optional[str]:
+    """Zone whose wall clock the cycle runs on, None for UTC cycles"""
+    zone = cycle.get('timezone')
+    if zone == 'local':
+        return tz
+    return zone
+
+def cycle_epoch_seconds(cycle: Dict[str, Any], zone_name: Optional[str] = None) -> float:
+    """Cycle epoch in UTC seconds, or in wall clock seconds of zone_name for zoned cycles"""
+    return _epoch_seconds(cycle['epoch'], zone_name is not None)
+
+@lru_cache(maxsize=1024)
+def _epoch_seconds(epoch_str: str, wall_clock: bool) -> float:
+    epoch = CycleCalculator.parse_datetime(epoch_str)
+    if not wall_clock:
+        return epoch.timestamp()
+    # The epoch wall clock time is kept as is in the cycle zone
+    return epoch.replace(tzinfo=timezone.utc).timestamp()
+
 class CycleCalculator:
     @staticmethod
-    def datetime_to_pixel(dt_str: str, cycle: Dict[str, Any], cycle_px: int = 1460) -> Dict[str, float]:
-        """Convert datetime to pixel position within cycle"""
+    def parse_datetime(dt_str: str, tz: Optional[str] = None) -> datetime:
+        """Parse ISO datetime string, naive values are taken in tz (UTC by default)"""
         # Handle timezone information properly
         if dt_str.endswith('Z'):
-            dt = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+            return datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
         elif '+' in dt_str or '-' in dt_str[10:]:  # Check if timezone info is already present
-            dt = datetime.fromisoformat(dt_str)
+            return datetime.fromisoformat(dt_str)
+        elif tz is not None:
+            return datetime.fromisoformat(dt_str).replace(tzinfo=get_zone(tz))
         else:
-            dt = datetime.fromisoformat(dt_str + '+00:00')
-        
-        epoch = datetime.fromisoformat(cycle['epoch'].replace('Z', '+00:00'))
+            return datetime.fromisoformat(dt_str + '+00:00')
+
+    @staticmethod
+    def datetime_to_pixel(dt_str: str, cycle: Dict[str, Any], cycle_px: int = 1460, tz: Optional[str] = None) -> Dict[str, float]:
+        """Convert datetime to pixel position within cycle"""
+        dt = CycleCalculator.parse_datetime(dt_str, tz)
+        if cycle.get('ephemeris'):
+            position = CycleCalculator.positions(np.array([dt.timestamp()]), cycle, cycle_px, tz)
+            return {
+                "pixel_x": float(position['pixel_x'][0]),
+                "phase_percent": float(position['phase_percent'][0]),
+                "quadrant": int(position['quadrant'][0]),
+                "quadrant_progress": float(position['quadrant_progress'][0])
+            }
+        zone = resolve_cycle_zone(cycle, tz)
         
         # Calculate delta in smallest units
-        delta_seconds = (dt - epoch).total_seconds()
+        if zone is None:
+            epoch = datetime.fromisoformat(cycle['epoch'].replace('Z', '+00:00'))
+            delta_seconds = (dt - epoch).total_seconds()
+        else:
+            delta_seconds = local_seconds(dt.timestamp(), zone) - cycle_epoch_seconds(cycle, zone)
+        return CycleCalculator.delta_to_pixel(delta_seconds, cycle, cycle_px)
+
+    @staticmethod
+    def delta_to_pixel(delta_seconds: float, cycle: Dict[str, Any], cycle_px: int = 1460) -> Dict[str, float]:
+        """Pixel position for seconds elapsed since the cycle epoch"""
         period_seconds = cycle['period_days'] * 86400
-        unit_seconds = cycle['unit_seconds']
         
         # Handle negative time (before epoch)
         if delta_seconds < 0:
@@ -176,6 +394,120 @@ class CycleCalculator:
             "quadrant_progress": quadrant_progress
         }
     
+    @staticmethod
+    def quantized_position(dt_str: str, cycle: Dict[str, Any], cycle_px: int = 1460, tz: Optional[str] = None) -> Dict[str, float]:
+        """datetime_to_pixel snapped to the start of the cycle's unit_seconds bucket, memoized"""
+        bucket = CycleCalculator.position_bucket(dt_str, cycle, tz)
+        zone = None if cycle.get('ephemeris') else resolve_cycle_zone(cycle, tz)
+        return dict(_quantized_position(cycle_cache_key(cycle), zone, bucket, cycle_px))
+
+    @staticmethod
+    def position_bucket(dt_str: str, cycle: Dict[str, Any], tz: Optional[str] = None) -> int:
+        """Index of the unit_seconds bucket since the cycle epoch containing dt_str"""
+        dt = CycleCalculator.parse_datetime(dt_str, tz)
+        # Ephemeris boundaries are instants, other cycles bucket on their own (wall) clock
+        zone = None if cycle.get('ephemeris') else resolve_cycle_zone(cycle, tz)
+        delta_seconds = local_seconds(dt.timestamp(), zone) - cycle_epoch_seconds(cycle, zone)
+        return math.floor(delta_seconds / cycle['unit_seconds'])
+
+    @staticmethod
+    def positions(utc_seconds: np.ndarray, cycle: Dict[str, Any], cycle_px: int = 1460, tz: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Vectorized datetime_to_pixel over an array of UTC timestamps (seconds)"""
+        utc_seconds = np.asarray(utc_seconds, dtype=np.float64)
+        if cycle.get('ephemeris'):
+            return CycleCalculator.ephemeris_positions(utc_seconds, cycle, cycle_px, tz)
+        zone = resolve_cycle_zone(cycle, tz)
+        delta_seconds = local_seconds_array(utc_seconds, zone) - cycle_epoch_seconds(cycle, zone)
+        period_seconds = cycle['period_days'] * 86400
+
+        cycle_progress = np.mod(delta_seconds, period_seconds) / period_seconds
+
+        # Same cumulative bounds as datetime_to_pixel, first quadrant whose end >= progress
+        quadrant_ratios = cycle['quadrant_ratios']
+        total_ratio = sum(quadrant_ratios)
+        starts, widths = [], []
+        cumulative = 0
+        for ratio in quadrant_ratios:
+            ratio_percent = ratio / total_ratio
+            starts.append(cumulative)
+            widths.append(ratio_percent)
+            cumulative += ratio_percent
+        starts = np.array(starts)
+        widths = np.array(widths)
+        quadrant = np.searchsorted(starts + widths, cycle_progress, side='left')
+        quadrant = np.minimum(quadrant, len(quadrant_ratios) - 1)
+        quadrant_progress = (cycle_progress - starts[quadrant]) / widths[quadrant]
+
+        quadrant_width = cycle_px / 4
+        return {
+            "pixel_x": quadrant * quadrant_width + quadrant_progress * quadrant_width,
+            "phase_percent": cycle_progress * 100,
+            "quadrant": quadrant,
+            "quadrant_progress": quadrant_progress,
+            "cycle_index": np.floor(delta_seconds / period_seconds).astype(np.int64)
+        }
+
+    @staticmethod
+    def ephemeris_positions(utc_seconds: np.ndarray, cycle: Dict[str, Any], cycle_px: int = 1460, tz: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Positions between true quadrant boundaries, mean period math outside the table range"""
+        table = load_ephemeris(cycle['ephemeris'])
+        index = np.searchsorted(table, utc_seconds, side='right') - 1
+        # The whole period around each timestamp must be in the table
+        inside = (index >= 0) & (index < len(table) - 4)
+
+        result = {
+            "pixel_x": np.empty(len(utc_seconds)),
+            "phase_percent": np.empty(len(utc_seconds)),
+            "quadrant": np.empty(len(utc_seconds), dtype=np.int64),
+            "quadrant_progress": np.empty(len(utc_seconds)),
+            "cycle_index": np.empty(len(utc_seconds), dtype=np.int64)
+        }
+        if not inside.all():
+            mean = CycleCalculator.positions(utc_seconds[~inside], {**cycle, 'ephemeris': None}, cycle_px, tz)
+            for key in result:
+                result[key][~inside] = mean[key]
+
+        index = index[inside]
+        seconds = utc_seconds[inside]
+        quadrant = index % 4
+        period_start = table[index - quadrant]
+        period_end = table[index - quadrant + 4]
+        quadrant_progress = (seconds - table[index]) / (table[index + 1] - table[index])
+
+        quadrant_width = cycle_px / 4
+        result['pixel_x'][inside] = quadrant * quadrant_width + quadrant_progress * quadrant_width
+        result['phase_percent'][inside] = (seconds - period_start) / (period_end - period_start) * 100
+        result['quadrant'][inside] = quadrant
+        result['quadrant_progress'][inside] = quadrant_progress
+        result['cycle_index'][inside] = index // 4 - _ephemeris_epoch_period(cycle['ephemeris'], cycle['epoch'])
+        return result
+
+    @staticmethod
+    def grid_phases(utc_seconds: np.ndarray, epoch_seconds: np.ndarray, period_seconds: np.ndarray,
+                    quadrant_ratios: Optional[np.ndarray] = None) -> np.ndarray:
+        """Phase in percent for candidates x dates by broadcasting.
+
+        utc_seconds has shape (dates,), the candidate arrays (candidates,) and
+        quadrant_ratios (candidates, 4). Without quadrant_ratios the time fraction
+        of the period (phase_percent) is returned, with them the position on the
+        drawn wave (pixel_x / cycle_px).
+        """
+        delta_seconds = utc_seconds[None, :] - epoch_seconds[:, None]
+        cycle_progress = np.mod(delta_seconds, period_seconds[:, None]) / period_seconds[:, None]
+        if quadrant_ratios is None:
+            return cycle_progress * 100
+
+        widths = quadrant_ratios / quadrant_ratios.sum(axis=1, keepdims=True)
+        ends = np.cumsum(widths, axis=1)
+        starts = ends - widths
+        # First quadrant whose end >= progress, as in datetime_to_pixel
+        quadrant = (cycle_progress[:, :, None] > ends[:, None, :]).sum(axis=2)
+        quadrant = np.minimum(quadrant, quadrant_ratios.shape[1] - 1)
+        quadrant_start = np.take_along_axis(starts, quadrant, axis=1)
+        quadrant_width = np.take_along_axis(widths, quadrant, axis=1)
+        quadrant_progress = (cycle_progress - quadrant_start) / quadrant_width
+        return (quadrant + quadrant_progress) / quadrant_ratios.shape[1] * 100
+
     @staticmethod
     def pixel_to_datetime(pixel_x: float, cycle: Dict[str, Any], cycle_px: int = 1460) -> str:
         """Convert pixel position to datetime"""
@@ -193,112 +525,701 @@ class CycleCalculator:
         
         return target_dt.isoformat() + 'Z'
 
+    @staticmethod
+    def quadrant_starts(cycle: Dict[str, Any], start_dt: datetime, end_dt: datetime, tz: Optional[str] = None) -> Iterator[Tuple[datetime, int, int]]:
+        """Lazily yield (datetime, period_index, quadrant) for every quadrant start in [start_dt, end_dt)"""
+        if cycle.get('ephemeris'):
+            # True boundaries, limited to the table range
+            table = load_ephemeris(cycle['ephemeris'])
+            base = _ephemeris_epoch_period(cycle['ephemeris'], cycle['epoch'])
+            index = int(np.searchsorted(table, start_dt.timestamp(), side='left'))
+            end_seconds = end_dt.timestamp()
+            while index < len(table) and table[index] < end_seconds:
+                yield datetime.fromtimestamp(float(table[index]), timezone.utc), index // 4 - base, index % 4
+                index += 1
+            return
+
+        zone = resolve_cycle_zone(cycle, tz)
+        epoch_seconds = cycle_epoch_seconds(cycle, zone)
+        period_seconds = cycle['period_days'] * 86400
+
+        quadrant_ratios = cycle['quadrant_ratios']
+        total_ratio = sum(quadrant_ratios)
+        offsets = []
+        cumulative = 0
+        for ratio in quadrant_ratios:
+            offsets.append(cumulative / total_ratio)
+            cumulative += ratio
+
+        start_seconds = local_seconds(start_dt.timestamp(), zone)
+        period_index = math.floor((start_seconds - epoch_seconds) / period_seconds)
+        while True:
+            for quadrant, offset in enumerate(offsets):
+                seconds = epoch_seconds + (period_index + offset) * period_seconds
+                dt = datetime.fromtimestamp(seconds, timezone.utc)
+                if zone is not None:
+                    # Wall clock time in the cycle zone back to a UTC instant
+                    dt = dt.replace(tzinfo=get_zone(zone)).astimezone(timezone.utc)
+                if dt >= end_dt:
+                    return
+                if dt >= start_dt:
+                    yield dt, period_index, quadrant
+            period_index += 1
+
+CALENDAR_DIVIDER_KINDS = ("year", "month", "week")
+CALENDAR_CACHE_SIZE = 512  # (cycle, year) entries
+CALENDAR_MAX_DAYS = 3660  # keeps one request well inside the cache
+
+def cycle_cache_key(cycle: Dict[str, Any]) -> tuple:
+    """Hashable key of the fields that affect cycle math"""
+    return (
+        cycle['epoch'],
+        float(cycle['period_days']),
+        tuple(cycle['quadrant_ratios']),
+        int(cycle['unit_seconds']),
+        cycle.get('timezone'),
+        cycle.get('ephemeris'),
+    )
+
+def _cycle_from_key(key: tuple) -> Dict[str, Any]:
+    epoch, period_days, quadrant_ratios, unit_seconds, zone, ephemeris = key
+    return {
+        "epoch": epoch,
+        "period_days": period_days,
+        "quadrant_ratios": list(quadrant_ratios),
+        "unit_seconds": unit_seconds,
+        "timezone": zone,
+        "ephemeris": ephemeris,
+    }
+
+@lru_cache(maxsize=CALENDAR_CACHE_SIZE)
+def _calendar_year_dividers(key: tuple, year: int, tz: Optional[str] = None) -> tuple:
+    """Year, month and week (Monday) boundaries of one calendar year in tz mapped to cycle pixels.
+
+    Returns (datetime, divider) pairs sorted by time.
+    """
+    cycle = _cycle_from_key(key)
+    cycle_px = 1460
+    zone = get_zone(tz) if tz is not None else timezone.utc
+
+    # A boundary shared by several kinds (e.g. Monday the 1st) is emitted once
+    boundaries: Dict[datetime, List[str]] = {}
+    first_day = datetime(year, 1, 1, tzinfo=zone)
+    boundaries.setdefault(first_day, []).append("year")
+    for month in range(1, 13):
+        boundaries.setdefault(datetime(year, month, 1, tzinfo=zone), []).append("month")
+    first_monday = first_day + timedelta(days=(7 - first_day.weekday()) % 7)
+    # Counted rather than stepped past the year end, which overflows in 9999
+    weeks = (datetime(year, 12, 31, tzinfo=zone) - first_monday).days // 7 + 1
+    for week in range(weeks):
+        boundaries.setdefault(first_monday + timedelta(days=7 * week), []).append("week")
+
+    dates = sorted(boundaries)
+    positions = CycleCalculator.positions(np.array([dt.timestamp() for dt in dates]), cycle, cycle_px, tz)
+
+    dividers = []
+    for i, dt in enumerate(dates):
+        kinds = boundaries[dt]
+        utc_dt = dt.astimezone(timezone.utc)
+        cycle_index = int(positions['cycle_index'][i])
+        pixel_x = float(positions['pixel_x'][i])
+        dividers.append((utc_dt, {
+            "date": utc_dt.isoformat().replace('+00:00', 'Z'),
+            "kind": kinds[0],
+            "kinds": kinds,
+            "x": pixel_x,
+            "absolute_x": cycle_index * cycle_px + pixel_x,
+            "cycle_index": cycle_index,
+            "phase": float(positions['phase_percent'][i]),
+            "quadrant": int(positions['quadrant'][i])
+        }))
+    return tuple(dividers)
+
+POSITION_CACHE_SIZE = int(os.environ.get('POSITION_CACHE_SIZE', 65536))  # (cycle, bucket) entries
+
+@lru_cache(maxsize=POSITION_CACHE_SIZE)
+def _quantized_position(key: tuple, zone: Optional[str], bucket: int, cycle_px: int) -> Dict[str, float]:
+    cycle = _cycle_from_key(key)
+    delta_seconds = bucket * cycle['unit_seconds']
+    if cycle['ephemeris']:
+        utc_seconds = cycle_epoch_seconds(cycle) + delta_seconds
+        dt_str = datetime.fromtimestamp(utc_seconds, timezone.utc).isoformat()
+        return CycleCalculator.datetime_to_pixel(dt_str, cycle, cycle_px)
+    return CycleCalculator.delta_to_pixel(delta_seconds, cycle, cycle_px)
+
+def position_cache_stats() -> Dict[str, Any]:
+    info = _quantized_position.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+        "size": info.currsize,
+        "max_size": info.maxsize
+    }
+
+def cycle_fingerprint(cycle: Dict[str, Any]) -> str:
+    """Short stable hash of the cycle math parameters"""
+    return hashlib.sha1(repr(cycle_cache_key(cycle)).encode('utf-8')).hexdigest()[:12]
+
+def encode_snapshot(state: Dict[str, Any]) -> str:
+    """Opaque url-safe token describing what a polling client already has"""
+    data = json.dumps(state, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+def decode_snapshot(token: Optional[str]) -> Dict[str, Any]:
+    """State of a snapshot token, empty for missing or malformed tokens (a full response)"""
+    if not token:
+        return {}
+    try:
+        state = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except ValueError:  # binascii.Error, UnicodeDecodeError and JSONDecodeError are ValueErrors
+        return {}
+    return state if isinstance(state, dict) else {}
+
+def wave_snapshot_window(state: Dict[str, Any], cycle: Dict[str, Any], tz: Optional[str]) -> tuple:
+    """(start, days) of the wave_data window a snapshot describes, (None, 0) when it does not apply"""
+    start, days = state.get("start"), state.get("days")
+    if state.get("cycle") != cycle_fingerprint(cycle) or state.get("tz") != tz:
+        return None, 0
+    if not isinstance(start, str) or type(days) is not int or days < 0:
+        return None, 0
+    try:
+        return CycleCalculator.parse_datetime(start, tz), days
+    except ValueError:
+        return None, 0
+
+ICAL_MAX_YEARS = 100
+ICAL_CHUNK_EVENTS = 256  # events per streamed chunk
+ICAL_CACHE_SECONDS = 3600
+ASPECT_LABELS = ["Magenta 0°", "Red 90°", "Green 180°", "Blue 270°"]
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header (RFC 9110)"""
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+def _ical_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def _ical_fold(line: str) -> str:
+    """Fold content line to 75 octets as required by RFC 5545"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    limit = 75
+    while len(encoded) > limit:
+        cut = limit
+        # Do not split a multi-byte character
+        while cut > 0 and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74  # continuation lines start with a space
+    parts.append(encoded.decode('utf-8'))
+    return '\r\n '.join(parts) + '\r\n'
+
+def _ical_time(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+def iter_ical_feed(cycles: List[Dict[str, Any]], start_dt: datetime, end_dt: datetime, tz: Optional[str] = None) -> Iterator[str]:
+    """Lazily generate an iCalendar feed of quadrant starts (aspect points) in chunks"""
+    yield (
+        'BEGIN:VCALENDAR\r\n'
+        'VERSION:2.0\r\n'
+        'PRODID:-//SiNo//Time Visualization//EN\r\n'
+        'CALSCALE:GREGORIAN\r\n'
+        'X-WR-CALNAME:SiNo Cycles\r\n'
+    )
+    dtstamp = _ical_time(start_dt)
+    for cycle in cycles:
+        slug = cycle['name'].lower().replace(' ', '_')
+        chunk = []
+        for dt, period_index, quadrant in CycleCalculator.quadrant_starts(cycle, start_dt, end_dt, tz):
+            summary = f"{cycle['name']} Q{quadrant + 1} ({ASPECT_LABELS[quadrant]})"
+            chunk.append(
+                'BEGIN:VEVENT\r\n'
+                f'UID:{slug}-{period_index}-{quadrant}@sino\r\n'
+                f'DTSTAMP:{dtstamp}\r\n'
+                f'DTSTART:{_ical_time(dt)}\r\n'
+                + _ical_fold(f'SUMMARY:{_ical_escape(summary)}')
+                + _ical_fold(f'DESCRIPTION:{_ical_escape(cycle["description"])}')
+                + 'TRANSP:TRANSPARENT\r\n'
+                'END:VEVENT\r\n'
+            )
+            if len(chunk) >= ICAL_CHUNK_EVENTS:
+                yield ''.join(chunk)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk)
+    yield 'END:VCALENDAR\r\n'
+
+SWEEP_MAX_CANDIDATES = 1_000_000
+SWEEP_MAX_DATES = 10_000
+SWEEP_CHUNK_ELEMENTS = 1_000_000  # candidates x dates evaluated at once
+
+def sweep_scores(request: SweepRequest) -> np.ndarray:
+    """RMS circular phase error (percent) of every candidate in the parameter grid.
+
+    Candidates are ordered period-major: index = (period * epochs + epoch) * ratios + ratio.
+    """
+    utc_seconds = np.array([CycleCalculator.parse_datetime(d, request.timezone).timestamp() for d in request.dates])
+    targets = np.array(request.target_phases, dtype=np.float64)
+    periods = np.array(request.period_days, dtype=np.float64) * 86400
+    epochs = np.array([CycleCalculator.parse_datetime(e, request.timezone).timestamp() for e in request.epochs])
+    ratios = np.array(request.quadrant_ratios, dtype=np.float64)
+
+    grid_shape = (len(periods), len(epochs), len(ratios))
+    total = len(periods) * len(epochs) * len(ratios)
+    chunk = max(1, SWEEP_CHUNK_ELEMENTS // len(utc_seconds))
+
+    scores = np.empty(total)
+    for start in range(0, total, chunk):
+        flat = np.arange(start, min(start + chunk, total))
+        period_index, epoch_index, ratio_index = np.unravel_index(flat, grid_shape)
+        phases = CycleCalculator.grid_phases(
+            utc_seconds,
+            epochs[epoch_index],
+            periods[period_index],
+            ratios[ratio_index] if request.metric == "wave" else None
+        )
+        error = np.abs(phases - targets[None, :]) % 100
+        error = np.minimum(error, 100 - error)  # phases wrap around
+        scores[flat] = np.sqrt((error ** 2).mean(axis=1))
+    return scores
+
+CYCLE_IMPORT_BATCH_SIZE = 1000
+CYCLE_EXPORT_BATCH_SIZE = 1000
+CYCLE_IMPORT_MAX_ERRORS = 100  # reported per import
+_cycle_indexes_ready = False
+
+def validate_cycle(cycle: CycleCreate) -> Optional[str]:
+    """Error message for cycle parameters the calculator cannot use, None when valid"""
+    if cycle.period_days <= 0:
+        return "period_days must be positive"
+    if len(cycle.quadrant_ratios) != 4 or min(cycle.quadrant_ratios) <= 0:
+        return "quadrant_ratios must have 4 positive values"
+    if cycle.unit_seconds <= 0:
+        return "unit_seconds must be positive"
+    try:
+        CycleCalculator.parse_datetime(cycle.epoch)
+    except ValueError:
+        return "epoch must be an ISO datetime"
+    if cycle.timezone != 'local' and not is_valid_zone(cycle.timezone):
+        return "Unknown timezone"
+    if cycle.ephemeris is not None and cycle.ephemeris not in EPHEMERIS_TABLES:
+        return f"Unknown ephemeris, expected one of {', '.join(EPHEMERIS_TABLES)}"
+    return None
+
+def cycle_upsert(cycle: CycleCreate) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Filter and update upserting a custom cycle by name, keeping the id of an existing one"""
+    return {"name": cycle.name}, {"$set": cycle.dict(), "$setOnInsert": {"id": str(uuid.uuid4())}}
+
+async def ensure_cycle_indexes():
+    global _cycle_indexes_ready
+    if not _cycle_indexes_ready:
+        await db.custom_cycles.create_index("name", unique=True)
+        _cycle_indexes_ready = True
+
+async def iter_ndjson_lines(request: Request) -> AsyncIterator[Tuple[int, bytes]]:
+    """Yield (line number, line) from a streamed NDJSON request body"""
+    buffer = b''
+    line_number = 0
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_number += 1
+            yield line_number, line
+    if buffer:
+        yield line_number + 1, buffer
+
+async def iter_cycles_ndjson(include_presets: bool) -> AsyncIterator[str]:
+    """Stream custom cycles from Mongo as NDJSON without loading the collection"""
+    if include_presets:
+        yield ''.join(json.dumps(preset) + '\n' for preset in PRESET_CYCLES + EPHEMERIS_CYCLES)
+    cursor = db.custom_cycles.find({}, {"_id": 0}).batch_size(CYCLE_EXPORT_BATCH_SIZE)
+    chunk = []
+    async for document in cursor:
+        chunk.append(json.dumps(document) + '\n')
+        if len(chunk) >= CYCLE_EXPORT_BATCH_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "SiNo Time Visualization API"}
 
 @api_router.get("/cycles", response_model=List[CyclePreset])
-async def get_cycles():
+async def get_cycles(include_ephemeris: bool = False):
     """Get all available cycle presets"""
     cycles = []
-    for preset in PRESET_CYCLES:
+    for preset in PRESET_CYCLES + (EPHEMERIS_CYCLES if include_ephemeris else []):
         cycle = CyclePreset(**preset)
         cycles.append(cycle)
     return cycles
 
+@api_router.post("/cycles/import")
+async def import_cycles(request: Request):
+    """Import custom cycles from an NDJSON body, upserting by name in unordered batches"""
+    await ensure_cycle_indexes()
+
+    received = 0
+    invalid = 0
+    summary = {"upserted": 0, "modified": 0, "matched": 0, "failed": 0}
+    errors = []
+    batch = []
+    batch_lines = []
+
+    async def flush():
+        try:
+            result = await db.custom_cycles.bulk_write(batch, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            # Unordered writes carry on past failing documents (e.g. a racing duplicate name)
+            details = e.details
+        summary["upserted"] += details.get("nUpserted", 0)
+        summary["modified"] += details.get("nModified", 0)
+        summary["matched"] += details.get("nMatched", 0)
+        for write_error in details.get("writeErrors", []):
+            summary["failed"] += 1
+            if len(errors) < CYCLE_IMPORT_MAX_ERRORS:
+                errors.append({"line": batch_lines[write_error["index"]], "error": write_error.get("errmsg", "Write failed")})
+        batch.clear()
+        batch_lines.clear()
+
+    async for line_number, line in iter_ndjson_lines(request):
+        if not line.strip():
+            continue
+        received += 1
+        try:
+            cycle = CycleCreate(**json.loads(line))
+            error = validate_cycle(cycle)
+        except (ValueError, TypeError, ValidationError) as e:  # JSONDecodeError is a ValueError
+            error = str(e)
+        if error:
+            invalid += 1
+            if len(errors) < CYCLE_IMPORT_MAX_ERRORS:
+                errors.append({"line": line_number, "error": error})
+            continue
+        batch.append(UpdateOne(*cycle_upsert(cycle), upsert=True))
+        batch_lines.append(line_number)
+        if len(batch) >= CYCLE_IMPORT_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    return {
+        "received": received,
+        **summary,
+        "invalid": invalid,
+        "errors": errors
+    }
+
+@api_router.get("/cycles/export")
+async def export_cycles(include_presets: bool = False):
+    """Stream custom cycles (and optionally presets) as NDJSON"""
+    return StreamingResponse(
+        iter_cycles_ndjson(include_presets),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="cycles.ndjson"'}
+    )
+
 @api_router.get("/cycles/{cycle_name}")
 async def get_cycle(cycle_name: str):
     """Get specific cycle by name"""
-    for preset in PRESET_CYCLES:
-        if preset['name'].lower().replace(' ', '_') == cycle_name.lower():
-            return preset
+    cycle = find_preset(cycle_name)
+    if cycle:
+        return cycle
     return {"error": "Cycle not found"}
 
 @api_router.post("/position")
-async def calculate_position(time_pos: TimePosition) -> PositionResponse:
+async def calculate_position(time_pos: TimePosition):
     """Calculate pixel position for given datetime and cycle"""
-    # Find cycle
-    cycle = None
-    for preset in PRESET_CYCLES:
-        if preset['name'].lower().replace(' ', '_') == time_pos.cycle_id.lower():
-            cycle = preset
-            break
+    cycle = find_preset(time_pos.cycle_id)
     
     if not cycle:
         return {"error": "Cycle not found"}
+    if not await load_zone(time_pos.timezone):
+        return {"error": "Unknown timezone"}
     
-    result = CycleCalculator.datetime_to_pixel(time_pos.datetime_iso, cycle)
+    if time_pos.quantize:
+        result = CycleCalculator.quantized_position(time_pos.datetime_iso, cycle, tz=time_pos.timezone)
+    else:
+        result = CycleCalculator.datetime_to_pixel(time_pos.datetime_iso, cycle, tz=time_pos.timezone)
     return PositionResponse(**result)
 
+@api_router.get("/position/cache")
+async def get_position_cache():
+    """Get hit rate and size of the quantized position cache"""
+    return position_cache_stats()
+
+@api_router.delete("/position/cache")
+async def clear_position_cache():
+    """Clear the quantized position cache"""
+    _quantized_position.cache_clear()
+    return position_cache_stats()
+
 @api_router.get("/current_time")
-async def get_current_time():
-    """Get current time in all cycles"""
+async def get_current_time(response: Response, tz: str = None, since: str = None):
+    """Get current time in all cycles.
+
+    With since (a version token, empty for the first poll) only cycles whose
+    position moved to another unit_seconds bucket are returned, without the
+    static cycle data.
+    """
+    if not await load_zone(tz):
+        return {"error": "Unknown timezone"}
+
     current_time = datetime.utcnow().isoformat() + 'Z'
-    results = {}
+    snapshot = {}
+    for preset in PRESET_CYCLES:
+        slug = preset['name'].lower().replace(' ', '_')
+        snapshot[slug] = [cycle_fingerprint(preset), CycleCalculator.position_bucket(current_time, preset, tz)]
+    version = encode_snapshot({"tz": tz, "cycles": snapshot})
     
+    if since is None:
+        results = {}
+        for preset in PRESET_CYCLES:
+            position = CycleCalculator.datetime_to_pixel(current_time, preset, tz=tz)
+            results[preset['name']] = {
+                **position,
+                "datetime": current_time,
+                "cycle": preset
+            }
+        response.headers["X-Snapshot-Version"] = version
+        return results
+
+    previous = decode_snapshot(since)
+    known = previous.get("cycles") if previous.get("tz") == tz else None
+    if not isinstance(known, dict):
+        known = {}
+    changed = {}
     for preset in PRESET_CYCLES:
-        position = CycleCalculator.datetime_to_pixel(current_time, preset)
-        results[preset['name']] = {
-            **position,
-            "datetime": current_time,
-            "cycle": preset
-        }
+        slug = preset['name'].lower().replace(' ', '_')
+        if known.get(slug) != snapshot[slug]:
+            changed[preset['name']] = CycleCalculator.datetime_to_pixel(current_time, preset, tz=tz)
     
-    return results
+    return {
+        "version": version,
+        "datetime": current_time,
+        "changed": changed
+    }
 
-@api_router.post("/custom_cycle", response_model=CyclePreset)
+@api_router.post("/custom_cycle")
 async def create_custom_cycle(cycle: CycleCreate):
     """Create a custom cycle preset"""
-    cycle_dict = cycle.dict()
-    cycle_obj = CyclePreset(**cycle_dict)
-    # In a real app, you'd save to database
-    return cycle_obj
+    error = validate_cycle(cycle)
+    if error:
+        return {"error": error}
+    await ensure_cycle_indexes()
+    saved = await db.custom_cycles.find_one_and_update(
+        *cycle_upsert(cycle),
+        upsert=True,
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    return CyclePreset(**saved)
 
 @api_router.get("/wave_data/{cycle_name}")
-async def get_wave_data(cycle_name: str, start_date: str = None, days: int = 30):
-    """Get wave rendering data for specified period"""
-    if start_date is None:
+async def get_wave_data(cycle_name: str, start_date: str = None, days: int = 30, tz: str = None, since: str = None):
+    """Get wave rendering data for specified period.
+
+    With since (the version of a previous response) only points that are not in
+    the previous window are returned and the static cycle data is left out. The
+    default start is then the current UTC day, so repeated polls share points.
+    """
+    if start_date is None and since is not None:
+        start_date = datetime.utcnow().strftime('%Y-%m-%dT00:00:00Z')
+    elif start_date is None:
         start_date = datetime.utcnow().isoformat() + 'Z'
     
-    # Find cycle
-    cycle = None
-    for preset in PRESET_CYCLES:
-        if preset['name'].lower().replace(' ', '_') == cycle_name.lower():
-            cycle = preset
-            break
+    cycle = find_preset(cycle_name)
     
     if not cycle:
         return {"error": "Cycle not found"}
+    if not await load_zone(tz):
+        return {"error": "Unknown timezone"}
     
     # Generate wave points
-    # Handle timezone information properly
-    if start_date.endswith('Z'):
-        start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-    elif '+' in start_date or '-' in start_date[10:]:  # Check if timezone info is already present
-        start_dt = datetime.fromisoformat(start_date)
-    else:
-        start_dt = datetime.fromisoformat(start_date + '+00:00')
+    start_dt = CycleCalculator.parse_datetime(start_date, tz)
+    dates = [start_dt + timedelta(days=day) for day in range(days)]
+    date_strs = [dt.isoformat().replace('+00:00', 'Z') for dt in dates]  # Ensure consistent format
+    
+    # Points of the previous window are not sent again
+    previous_start, previous_days = wave_snapshot_window(decode_snapshot(since), cycle, tz)
+    new_indices = []
+    for i, dt in enumerate(dates):
+        if previous_start is not None:
+            offset = dt - previous_start
+            if offset == timedelta(days=offset.days) and 0 <= offset.days < previous_days:
+                continue
+        new_indices.append(i)
+    positions = CycleCalculator.positions(np.array([dates[i].timestamp() for i in new_indices]), cycle, tz=tz)
     
     points = []
     
-    for day in range(days):
-        dt = start_dt + timedelta(days=day)
-        dt_str = dt.isoformat().replace('+00:00', 'Z')  # Ensure consistent format
-        position = CycleCalculator.datetime_to_pixel(dt_str, cycle)
+    for j, i in enumerate(new_indices):
         points.append({
-            "date": dt_str,
-            "x": position['pixel_x'],
-            "phase": position['phase_percent'],
-            "quadrant": position['quadrant']
+            "date": date_strs[i],
+            "x": float(positions['pixel_x'][j]),
+            "phase": float(positions['phase_percent'][j]),
+            "quadrant": int(positions['quadrant'][j])
         })
     
+    if since is not None:
+        return {
+            "version": encode_snapshot({"cycle": cycle_fingerprint(cycle), "tz": tz, "start": start_date, "days": days}),
+            "start": date_strs[0] if date_strs else None,
+            "end": date_strs[-1] if date_strs else None,
+            "points": points,
+            "cycle_px": 1460
+        }
+    
     return {
         "cycle": cycle,
         "points": points,
         "cycle_px": 1460
     }
 
+@api_router.get("/calendar_dividers/{cycle_name}")
+async def get_calendar_dividers(cycle_name: str, start_date: str = None, days: int = 365, kinds: str = "year,month,week", tz: str = None):
+    """Get calendar year/month/week boundaries mapped to cycle pixel positions"""
+    if start_date is None:
+        start_date = datetime.utcnow().isoformat() + 'Z'
+
+    cycle = find_preset(cycle_name)
+
+    if not cycle:
+        return {"error": "Cycle not found"}
+
+    requested_kinds = {kind.strip().lower() for kind in kinds.split(',') if kind.strip()}
+    if not requested_kinds <= set(CALENDAR_DIVIDER_KINDS):
+        return {"error": f"Unknown divider kind, expected any of {', '.join(CALENDAR_DIVIDER_KINDS)}"}
+    if days < 1 or days > CALENDAR_MAX_DAYS:
+        return {"error": f"days must be between 1 and {CALENDAR_MAX_DAYS}"}
+    if not await load_zone(tz):
+        return {"error": "Unknown timezone"}
+
+    start_dt = CycleCalculator.parse_datetime(start_date, tz).astimezone(timezone.utc)
+    # One spare day so the end can still be converted to the calendar zone
+    if start_dt > datetime.max.replace(tzinfo=timezone.utc) - timedelta(days=days + 1):
+        return {"error": f"The range must end before the year {datetime.max.year + 1}"}
+    end_dt = start_dt + timedelta(days=days)
+    key = cycle_cache_key(cycle)
+    calendar_zone = get_zone(tz) if tz is not None else timezone.utc
+
+    dividers = []
+    for year in range(start_dt.astimezone(calendar_zone).year, end_dt.astimezone(calendar_zone).year + 1):
+        for dt, divider in _calendar_year_dividers(key, year, tz):
+            if requested_kinds.intersection(divider['kinds']) and start_dt <= dt < end_dt:
+                dividers.append(divider)
+
+    return {
+        "cycle": cycle,
+        "dividers": dividers,
+        "cycle_px": 1460
+    }
+
+@api_router.get("/export/{cycle_names}.ics")
+async def export_ical(cycle_names: str, request: Request, start_date: str = None, years: int = 1, tz: str = None):
+    """Stream quadrant starts of one or more comma separated cycles as an iCalendar feed"""
+    cycles = []
+    for cycle_name in cycle_names.split(','):
+        cycle = find_preset(cycle_name.strip())
+        if not cycle:
+            return {"error": f"Cycle not found: {cycle_name.strip()}"}
+        cycles.append(cycle)
+
+    if years < 1 or years > ICAL_MAX_YEARS:
+        return {"error": f"years must be between 1 and {ICAL_MAX_YEARS}"}
+    if not await load_zone(tz):
+        return {"error": "Unknown timezone"}
+
+    # Default to the start of the current year so the feed stays stable between polls
+    if start_date is None:
+        start_dt = datetime(datetime.utcnow().year, 1, 1, tzinfo=timezone.utc)
+    else:
+        start_dt = CycleCalculator.parse_datetime(start_date, tz).astimezone(timezone.utc)
+    if start_dt.year + years > datetime.max.year:
+        return {"error": f"The feed must end before the year {datetime.max.year + 1}"}
+    try:
+        end_dt = start_dt.replace(year=start_dt.year + years)
+    except ValueError:  # February 29th
+        end_dt = start_dt.replace(year=start_dt.year + years, month=3, day=1)
+
+    # The feed is fully determined by cycle parameters and range
+    fingerprint = repr(([cycle_cache_key(c) + (c['name'], c['description']) for c in cycles], start_dt, end_dt, tz))
+    etag = '"' + hashlib.sha1(fingerprint.encode('utf-8')).hexdigest() + '"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={ICAL_CACHE_SECONDS}",
+    }
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    # Built from the resolved cycles, the raw path may carry encoded whitespace or CRLF
+    filename = ','.join(c['name'].lower().replace(' ', '_') for c in cycles)
+    headers["Content-Disposition"] = f'attachment; filename="{filename}.ics"'
+    return StreamingResponse(
+        iter_ical_feed(cycles, start_dt, end_dt, tz),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers
+    )
+
+@api_router.post("/sweep")
+def sweep_cycle_parameters(request: SweepRequest):  # CPU bound, runs in the threadpool
+    """Score a grid of candidate cycle parameters against target phases of reference dates"""
+    if not request.dates or len(request.dates) != len(request.target_phases):
+        return {"error": "dates and target_phases must be non-empty and of equal length"}
+    if len(request.dates) > SWEEP_MAX_DATES:
+        return {"error": f"At most {SWEEP_MAX_DATES} dates are supported"}
+    if not request.period_days or not request.epochs or not request.quadrant_ratios:
+        return {"error": "period_days, epochs and quadrant_ratios must not be empty"}
+    if any(period <= 0 for period in request.period_days):
+        return {"error": "period_days must be positive"}
+    if any(len(ratios) != 4 or min(ratios) <= 0 for ratios in request.quadrant_ratios):
+        return {"error": "quadrant_ratios must have 4 positive values"}
+    if request.metric not in ("wave", "phase"):
+        return {"error": "metric must be 'wave' or 'phase'"}
+    if not is_valid_zone(request.timezone):
+        return {"error": "Unknown timezone"}
+
+    total = len(request.period_days) * len(request.epochs) * len(request.quadrant_ratios)
+    if total > SWEEP_MAX_CANDIDATES:
+        return {"error": f"Grid has {total} candidates, at most {SWEEP_MAX_CANDIDATES} are supported"}
+
+    scores = sweep_scores(request)
+
+    top = min(max(request.top, 0), total)
+    best = np.argsort(scores)[:top] if top == total else np.argpartition(scores, top)[:top]
+    best = best[np.argsort(scores[best])]
+
+    grid_shape = (len(request.period_days), len(request.epochs), len(request.quadrant_ratios))
+    results = []
+    for index in best:
+        period_index, epoch_index, ratio_index = np.unravel_index(index, grid_shape)
+        results.append({
+            "index": int(index),
+            "period_days": request.period_days[period_index],
+            "epoch": request.epochs[epoch_index],
+            "quadrant_ratios": request.quadrant_ratios[ratio_index],
+            "score": float(scores[index])
+        })
+
+    response = {
+        "candidates": total,
+        "metric": request.metric,
+        "best": results
+    }
+    if request.include_scores:
+        response["scores"] = scores.tolist()
+    return response
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -1,5 +1,6 @@
 import requests
 import json
+import base64
 import datetime
 import unittest
 import math
@@ -286,6 +287,355 @@ class SiNoBackendTests(unittest.TestCase):
         
         print("✅ Wave Data API test passed")
 
+    def test_calendar_dividers_api(self):
+        """Test the /api/calendar_dividers/{cycle_name} endpoint to verify calendar boundaries in pixel space"""
+        print("\n=== Testing Calendar Dividers API ===")
+        
+        response = requests.get(f"{BACKEND_URL}/calendar_dividers/solar_year?start_date=2025-01-01T00:00:00Z&days=365")
+        self.assertEqual(response.status_code, 200, "Calendar Dividers API should return 200 status code")
+        
+        result = response.json()
+        self.assertIn("dividers", result, "Result should contain dividers array")
+        self.assertEqual(result["cycle_px"], 1460, "cycle_px should be 1460")
+        
+        dividers = result["dividers"]
+        months = [d for d in dividers if "month" in d["kinds"]]
+        self.assertEqual(len(months), 12, "A 365 day range from January 1st should contain 12 month starts")
+        self.assertEqual(len({d["date"] for d in dividers}), len(dividers), "Each boundary should be returned only once")
+        
+        # Dividers must agree with the position API
+        for divider in months[:3]:
+            payload = {"datetime_iso": divider["date"], "cycle_id": "solar_year"}
+            position = requests.post(f"{BACKEND_URL}/position", json=payload).json()
+            self.assertAlmostEqual(divider["x"], position["pixel_x"], places=6,
+                                   msg=f"Divider at {divider['date']} should match /position pixel_x")
+        
+        # Test filtering and invalid kinds
+        response = requests.get(f"{BACKEND_URL}/calendar_dividers/solar_year?start_date=2025-01-01T00:00:00Z&days=31&kinds=week")
+        weeks = response.json()["dividers"]
+        self.assertTrue(all("week" in d["kinds"] for d in weeks), "Only week dividers should be returned")
+        
+        response = requests.get(f"{BACKEND_URL}/calendar_dividers/solar_year?kinds=day")
+        self.assertIn("error", response.json(), "Should return error for unknown divider kind")
+
+        response = requests.get(f"{BACKEND_URL}/calendar_dividers/solar_year?days=10000000")
+        self.assertIn("error", response.json(), "Should return error for an unbounded range")
+
+        response = requests.get(f"{BACKEND_URL}/calendar_dividers/solar_year?start_date=9999-06-01T00:00:00Z&days=400")
+        self.assertEqual(response.status_code, 200, "Range past year 9999 should not be a server error")
+        self.assertIn("error", response.json(), "Should return error for a range past year 9999")
+
+        response = requests.get(f"{BACKEND_URL}/calendar_dividers/nonexistent_cycle")
+        self.assertIn("error", response.json(), "Should return error for non-existent cycle")
+        
+        print("✅ Calendar Dividers API test passed")
+
+    def test_ical_export_api(self):
+        """Test the /api/export/{cycles}.ics endpoint to verify iCalendar feed and conditional GET"""
+        print("\n=== Testing iCal Export API ===")
+        
+        url = f"{BACKEND_URL}/export/solar_year,lunar_month.ics?start_date=2025-01-01T00:00:00Z&years=1"
+        response = requests.get(url)
+        self.assertEqual(response.status_code, 200, "iCal Export API should return 200 status code")
+        self.assertIn("text/calendar", response.headers["content-type"], "Feed should be served as text/calendar")
+        self.assertIn("etag", response.headers, "Feed should carry an ETag")
+        
+        body = response.text
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"), "Feed should start with VCALENDAR")
+        self.assertTrue(body.endswith("END:VCALENDAR\r\n"), "Feed should end with VCALENDAR")
+        self.assertIn("DTSTART:20250320T000000Z", body, "Solar Year epoch quadrant start should be exported")
+        self.assertIn("UID:lunar_month-", body, "Lunar Month events should be in the same feed")
+        # 4 Solar Year quadrants + ~12.4 lunar months of 4 quadrants
+        self.assertGreaterEqual(body.count("BEGIN:VEVENT"), 4 + 48, "Feed should contain every quadrant start")
+        
+        # Conditional GET
+        response = requests.get(url, headers={"If-None-Match": response.headers["etag"]})
+        self.assertEqual(response.status_code, 304, "Unchanged feed should return 304")
+        etag = response.headers["etag"]
+        response = requests.get(url, headers={"If-None-Match": f'"other", W/{etag}'})
+        self.assertEqual(response.status_code, 304, "Any listed tag should match")
+        response = requests.get(url, headers={"If-None-Match": etag[:-2] + '"'})
+        self.assertEqual(response.status_code, 200, "Partial tags should not match")
+        
+        response = requests.get(f"{BACKEND_URL}/export/%20solar_year%0D%0A.ics?start_date=2025-01-01T00:00:00Z")
+        self.assertEqual(response.headers["content-disposition"], 'attachment; filename="solar_year.ics"',
+                         "Filename should be built from the resolved cycle")
+        
+        response = requests.get(f"{BACKEND_URL}/export/solar_year.ics?start_date=9999-06-01T00:00:00Z")
+        self.assertIn("error", response.json(), "Should return error for a range past year 9999")
+        
+        response = requests.get(f"{BACKEND_URL}/export/nonexistent_cycle.ics")
+        self.assertIn("error", response.json(), "Should return error for non-existent cycle")
+        
+        print("✅ iCal Export API test passed")
+
+    def test_timezone_aware_positions(self):
+        """Test that local cycles follow the request timezone and UTC cycles ignore it"""
+        print("\n=== Testing Timezone Aware Positions ===")
+        
+        # Solar Day starts at 06:00 wall clock time in the viewer's zone, also across DST
+        for datetime_iso in ["2025-01-15T06:00:00", "2025-07-15T06:00:00"]:
+            payload = {"datetime_iso": datetime_iso, "cycle_id": "solar_day", "timezone": "Europe/Bratislava"}
+            response = requests.post(f"{BACKEND_URL}/position", json=payload)
+            self.assertEqual(response.status_code, 200, "Position API should accept a timezone")
+            result = response.json()
+            self.assertEqual(result["quadrant"], 0, f"{datetime_iso} local should be dawn")
+            self.assertAlmostEqual(result["phase_percent"] % 100, 0.0, places=3,
+                                   msg=f"{datetime_iso} local should be the start of the Solar Day")
+        
+        # UTC cycles only use the zone to interpret naive input
+        local = requests.post(f"{BACKEND_URL}/position", json={
+            "datetime_iso": "2025-06-01T02:00:00", "cycle_id": "solar_year", "timezone": "Europe/Bratislava"}).json()
+        utc = requests.post(f"{BACKEND_URL}/position", json={
+            "datetime_iso": "2025-06-01T00:00:00Z", "cycle_id": "solar_year"}).json()
+        self.assertAlmostEqual(local["pixel_x"], utc["pixel_x"], places=6, msg="Same instant should give the same position")
+        
+        response = requests.get(f"{BACKEND_URL}/wave_data/solar_day?start_date=2025-03-28T06:00:00&days=5&tz=Europe/Bratislava")
+        points = response.json()["points"]
+        self.assertTrue(all(point["quadrant"] == 0 and point["x"] < 1e-3 for point in points),
+                        "Local 06:00 should stay at the start of the Solar Day across the DST change")
+        
+        response = requests.get(f"{BACKEND_URL}/current_time?tz=Not/A_Zone")
+        self.assertIn("error", response.json(), "Should return error for unknown timezone")
+        
+        response = requests.post(f"{BACKEND_URL}/position", json={
+            "datetime_iso": "2025-06-01T00:00:00", "cycle_id": "solar_day", "timezone": "Bad/Zone"})
+        self.assertEqual(response.status_code, 200, "Unknown timezone should not be a server error")
+        self.assertIn("error", response.json(), "Should return error for unknown timezone")
+        
+        print("✅ Timezone Aware Positions test passed")
+
+    def test_ephemeris_cycles(self):
+        """Test ephemeris backed cycles to verify true new moon and equinox boundaries"""
+        print("\n=== Testing Ephemeris Cycles ===")
+        
+        response = requests.get(f"{BACKEND_URL}/cycles?include_ephemeris=true")
+        cycle_names = [cycle["name"] for cycle in response.json()]
+        self.assertIn("True Lunar Month", cycle_names, "Ephemeris cycles should be listed on request")
+        self.assertIn("True Solar Year", cycle_names, "Ephemeris cycles should be listed on request")
+        
+        # True events, to within a couple of minutes
+        test_cases = [
+            {"cycle": "true_lunar_month", "datetime": "2024-12-30T22:29:00Z", "expected_quadrant": 0},  # new moon 22:27
+            {"cycle": "true_lunar_month", "datetime": "2025-01-13T22:29:00Z", "expected_quadrant": 2},  # full moon 22:27
+            {"cycle": "true_solar_year", "datetime": "2025-03-20T09:04:00Z", "expected_quadrant": 0},  # equinox 09:01
+        ]
+        for test_case in test_cases:
+            with self.subTest(f"Testing {test_case['cycle']} at {test_case['datetime']}"):
+                payload = {"datetime_iso": test_case["datetime"], "cycle_id": test_case["cycle"]}
+                result = requests.post(f"{BACKEND_URL}/position", json=payload).json()
+                self.assertEqual(result["quadrant"], test_case["expected_quadrant"], "Should be just after the true event")
+                self.assertLess(result["quadrant_progress"], 0.001, "Should be just after the true event")
+        
+        print("✅ Ephemeris Cycles test passed")
+
+    def test_sweep_api(self):
+        """Test the /api/sweep endpoint to verify grid scoring of candidate cycle parameters"""
+        print("\n=== Testing Parameter Sweep API ===")
+        
+        # Reference phases taken from the Lunar Month preset itself
+        dates = ["2025-01-05T00:00:00Z", "2025-01-12T00:00:00Z", "2025-02-03T00:00:00Z", "2025-03-17T00:00:00Z"]
+        target_phases = []
+        for date in dates:
+            position = requests.post(f"{BACKEND_URL}/position", json={"datetime_iso": date, "cycle_id": "lunar_month"}).json()
+            target_phases.append(position["pixel_x"] / 1460 * 100)
+        
+        payload = {
+            "dates": dates,
+            "target_phases": target_phases,
+            "period_days": [29.0, 29.530589, 30.0],
+            "epochs": ["2025-01-01T00:00:00Z", "2025-01-02T00:00:00Z"],
+            "quadrant_ratios": [[1, 1, 1, 1], [7, 8, 7, 7]],
+            "top": 3
+        }
+        response = requests.post(f"{BACKEND_URL}/sweep", json=payload)
+        self.assertEqual(response.status_code, 200, "Sweep API should return 200 status code")
+        
+        result = response.json()
+        self.assertEqual(result["candidates"], 12, "Grid should be the product of all parameter lists")
+        self.assertEqual(len(result["best"]), 3, "Should return the requested number of candidates")
+        best = result["best"][0]
+        self.assertAlmostEqual(best["period_days"], 29.530589, msg="Best period should match the preset")
+        self.assertEqual(best["epoch"], "2025-01-01T00:00:00Z", "Best epoch should match the preset")
+        self.assertEqual(best["quadrant_ratios"], [7, 8, 7, 7], "Best ratios should match the preset")
+        self.assertAlmostEqual(best["score"], 0.0, places=6, msg="Preset parameters should have no error")
+        scores = [candidate["score"] for candidate in result["best"]]
+        self.assertEqual(scores, sorted(scores), "Candidates should be sorted by score")
+        
+        payload["target_phases"] = target_phases[:2]
+        response = requests.post(f"{BACKEND_URL}/sweep", json=payload)
+        self.assertIn("error", response.json(), "Should return error when dates and targets differ in length")
+        
+        print("✅ Parameter Sweep API test passed")
+
+    def test_quantized_position_cache(self):
+        """Test quantized /api/position lookups and the position cache statistics"""
+        print("\n=== Testing Quantized Position Cache ===")
+        
+        # Solar Day has 1 hour units, every time within the hour snaps to the hour
+        results = []
+        for datetime_iso in ["2025-01-01T12:00:00Z", "2025-01-01T12:20:00Z", "2025-01-01T12:59:59Z"]:
+            payload = {"datetime_iso": datetime_iso, "cycle_id": "solar_day", "quantize": True}
+            response = requests.post(f"{BACKEND_URL}/position", json=payload)
+            self.assertEqual(response.status_code, 200, "Quantized Position API should return 200 status code")
+            results.append(response.json())
+        self.assertTrue(all(result == results[0] for result in results), "Lookups in the same unit should be identical")
+        
+        exact = requests.post(f"{BACKEND_URL}/position", json={"datetime_iso": "2025-01-01T12:00:00Z", "cycle_id": "solar_day"}).json()
+        self.assertAlmostEqual(results[0]["pixel_x"], exact["pixel_x"], places=6, msg="Bucket start should match exact lookup")
+        
+        stats = requests.get(f"{BACKEND_URL}/position/cache").json()
+        for field in ["hits", "misses", "hit_rate", "size", "max_size"]:
+            self.assertIn(field, stats, f"Cache stats should include {field}")
+        self.assertGreaterEqual(stats["hits"], 2, "Repeated lookups in the same unit should hit the cache")
+        self.assertLessEqual(stats["size"], stats["max_size"], "Cache should be bounded")
+        
+        print("✅ Quantized Position Cache test passed")
+
+    def test_cycle_import_export_api(self):
+        """Test NDJSON import and export of custom cycle definitions"""
+        print("\n=== Testing Cycle Import/Export API ===")
+        
+        cycles = [
+            {"name": f"Import Test {i}", "epoch": "2025-01-01T00:00:00Z", "period_days": 10.0 + i,
+             "quadrant_ratios": [1, 1, 1, 1], "unit_seconds": 3600}
+            for i in range(3)
+        ]
+        lines = [json.dumps(cycle) for cycle in cycles] + ["{not json", json.dumps({**cycles[0], "quadrant_ratios": [1, 2]})]
+        response = requests.post(f"{BACKEND_URL}/cycles/import", data="\n".join(lines),
+                                 headers={"Content-Type": "application/x-ndjson"})
+        self.assertEqual(response.status_code, 200, "Import API should return 200 status code")
+        
+        result = response.json()
+        self.assertEqual(result["received"], 5, "All non-empty lines should be counted")
+        self.assertEqual(result["invalid"], 2, "Invalid lines should be rejected")
+        self.assertEqual(result["upserted"] + result["matched"], 3, "Valid cycles should be upserted")
+        self.assertEqual([error["line"] for error in result["errors"]], [4, 5], "Errors should carry line numbers")
+        
+        response = requests.get(f"{BACKEND_URL}/cycles/export")
+        self.assertEqual(response.status_code, 200, "Export API should return 200 status code")
+        self.assertIn("application/x-ndjson", response.headers["content-type"], "Export should be NDJSON")
+        exported = {json.loads(line)["name"]: json.loads(line) for line in response.text.splitlines() if line}
+        for cycle in cycles:
+            self.assertIn(cycle["name"], exported, f"{cycle['name']} should be exported")
+            self.assertIn("id", exported[cycle["name"]], "Exported cycles should have an id")
+        
+        response = requests.post(f"{BACKEND_URL}/custom_cycle", json={**cycles[0], "period_days": -1})
+        self.assertEqual(response.status_code, 200, "Invalid custom cycle should not be a server error")
+        self.assertIn("error", response.json(), "Should return error for an invalid custom cycle")
+        
+        print("✅ Cycle Import/Export API test passed")
+
+    def test_incremental_polling_api(self):
+        """Test diff responses for repeated current_time and wave_data polls"""
+        print("\n=== Testing Incremental Polling API ===")
+
+        response = requests.get(f"{BACKEND_URL}/current_time", params={"since": ""})
+        self.assertEqual(response.status_code, 200, "Current Time diff API should return 200 status code")
+        first = response.json()
+        self.assertIn("version", first, "Diff response should include a version token")
+        self.assertIn("Solar Year", first["changed"], "First poll should return every cycle")
+        self.assertNotIn("cycle", first["changed"]["Solar Year"], "Diff response should omit static cycle data")
+
+        second = requests.get(f"{BACKEND_URL}/current_time", params={"since": first["version"]}).json()
+        self.assertNotIn("Solar Year", second["changed"], "Unchanged cycles should not be returned again")
+
+        params = {"start_date": "2025-01-01T00:00:00Z", "days": 30, "since": ""}
+        window = requests.get(f"{BACKEND_URL}/wave_data/solar_year", params=params).json()
+        self.assertEqual(len(window["points"]), 30, "First window should return all points")
+        self.assertNotIn("cycle", window, "Diff response should omit static cycle data")
+
+        params = {"start_date": "2025-01-03T00:00:00Z", "days": 30, "since": window["version"]}
+        shifted = requests.get(f"{BACKEND_URL}/wave_data/solar_year", params=params).json()
+        self.assertEqual([point["date"] for point in shifted["points"]],
+                         ["2025-01-31T00:00:00Z", "2025-02-01T00:00:00Z"], "Shifted window should return only new points")
+
+        full = requests.get(f"{BACKEND_URL}/wave_data/solar_year",
+                            params={"start_date": "2025-01-03T00:00:00Z", "days": 30}).json()
+        self.assertEqual(full["points"][-2:], shifted["points"], "New points should match the full response")
+
+        # Polls without a start date share the default window
+        first_poll = requests.get(f"{BACKEND_URL}/wave_data/solar_year", params={"days": 7, "since": ""}).json()
+        second_poll = requests.get(f"{BACKEND_URL}/wave_data/solar_year",
+                                   params={"days": 7, "since": first_poll["version"]}).json()
+        self.assertEqual(len(first_poll["points"]), 7, "First default window should return all points")
+        self.assertEqual(second_poll["points"], [], "Unchanged default window should return no points")
+
+        # Tokens of the wrong shape fall back to a full response
+        fingerprint = json.loads(base64.urlsafe_b64decode(window["version"] + "=" * (-len(window["version"]) % 4)))["cycle"]
+        bad_states = [
+            ("wave_data", {"cycle": fingerprint, "tz": None, "days": 30}),
+            ("wave_data", {"cycle": fingerprint, "tz": None, "start": "not a date", "days": 30}),
+            ("wave_data", {"cycle": fingerprint, "tz": None, "start": "2025-01-01T00:00:00Z", "days": 10 ** 9}),
+            ("current_time", {"tz": None, "cycles": []}),
+        ]
+        for endpoint, state in bad_states:
+            token = base64.urlsafe_b64encode(json.dumps(state).encode()).decode().rstrip("=")
+            if endpoint == "wave_data":
+                response = requests.get(f"{BACKEND_URL}/wave_data/solar_year",
+                                        params={"start_date": "2025-01-03T00:00:00Z", "days": 30, "since": token})
+            else:
+                response = requests.get(f"{BACKEND_URL}/current_time", params={"since": token})
+            self.assertEqual(response.status_code, 200, f"Token {state} should not be a server error")
+        self.assertEqual(len(requests.get(f"{BACKEND_URL}/current_time", params={"since": token}).json()["changed"]), 6,
+                         "Malformed current_time token should return every cycle")
+
+        print("✅ Incremental Polling API test passed")
+
+class SiNoCliTests(unittest.TestCase):
+    """Offline conversion tool, runs locally against backend/cli.py"""
+
+    def test_cli_convert(self):
+        """Test that the convert command matches CycleCalculator for CSV and Parquet files"""
+        print("\n=== Testing CLI Convert ===")
+        import os
+        import sys
+        import tempfile
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+        import pandas as pd
+        from typer.testing import CliRunner
+        from cli import cli
+        from server import CycleCalculator, find_preset
+
+        # DST local export mixing offsets, naive and UTC values, plus naive times
+        # repeated at the fall back (ambiguous) and skipped at the spring forward (gap)
+        timestamps = ["2025-03-20T00:00:00Z", "2025-06-01T12:00:00Z", "2025-03-29T12:00:00+01:00",
+                      "2025-04-01T12:00:00+02:00", "2025-06-01T14:00:00",
+                      "2025-10-26T02:30:00", "2025-03-30T02:30:00"]
+        tz = "Europe/Bratislava"
+        suffixes = [".csv"]
+        try:
+            import pyarrow  # noqa: F401
+            suffixes.append(".parquet")
+        except ImportError:
+            pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for suffix in suffixes:
+                input_path = os.path.join(tmp, f"in{suffix}")
+                output_path = os.path.join(tmp, f"out{suffix}")
+                frame = pd.DataFrame({"timestamp": timestamps})
+                if suffix == ".csv":
+                    frame.to_csv(input_path, index=False)
+                else:
+                    frame.to_parquet(input_path, index=False)
+
+                result = CliRunner().invoke(cli, ["convert", input_path, output_path, "-c", "solar_year",
+                                                  "-c", "solar_day", "--tz", tz, "--workers", "1"])
+                self.assertEqual(result.exit_code, 0, f"{suffix} conversion should succeed: {result.output}")
+
+                output = pd.read_csv(output_path) if suffix == ".csv" else pd.read_parquet(output_path)
+                self.assertEqual(len(output), len(timestamps), "Every row should be converted")
+                for i, timestamp in enumerate(timestamps):
+                    for cycle_name in ["solar_year", "solar_day"]:
+                        expected = CycleCalculator.datetime_to_pixel(timestamp, find_preset(cycle_name), tz=tz)
+                        self.assertAlmostEqual(output[f"{cycle_name}_phase"][i], expected["phase_percent"], places=6,
+                                               msg=f"{cycle_name} phase of {timestamp} should match the API")
+                        self.assertEqual(output[f"{cycle_name}_quadrant"][i], expected["quadrant"],
+                                         f"{cycle_name} quadrant of {timestamp} should match the API")
+
+        print("✅ CLI Convert test passed")
+
 if __name__ == "__main__":
     print("Starting SiNo Backend API Tests...")
     print(f"Testing against backend URL: {BACKEND_URL}")
@@ -348,6 +348,7 @@ const ProfessionalWaveCanvas = ({
   const svgRef = useRef(null);
   const [mousePosition, setMousePosition] = useState(null);
   const [hoverDate, setHoverDate] = useState(null);
+  const [calendarDividers, setCalendarDividers] = useState([]);
   const isDragging = useRef(false);
   const dragStart = useRef({ x: 0 });
 
@@ -453,37 +454,26 @@ const ProfessionalWaveCanvas = ({
   };
 
   // Draw calendar monthly dividers (1st of each month) - ONLY ONCE
+  // Positions come from the backend, which emits every boundary exactly once
   const drawCalendarMonthlyDividers = (svg, timeframe) => {
     if (activeTimeframe !== 'Solar Year') return; // Only for Solar Year
     
-    const baseYear = 2025;
-    const drawnPositions = new Set(); // Prevent duplicates
-    
-    for (let year = baseYear - 2; year <= baseYear + 5; year++) {
-      for (let month = 0; month < 12; month++) {
-        // First day of each calendar month
-        const monthStart = new Date(year, month, 1);
-        const monthPixel = dateToPixel(monthStart, timeframe);
-        
-        // Calculate position relative to current view
-        const adjustedPixel = monthPixel - translateX;
-        const pixelKey = Math.round(adjustedPixel); // Round to prevent tiny differences
-        
-        if (adjustedPixel >= -50 && adjustedPixel <= CANVAS_WIDTH + 50 && !drawnPositions.has(pixelKey)) {
-          drawnPositions.add(pixelKey);
-          
-          const line = document.createElementNS('http://www.w3.org/2000/svg', 'line');
-          line.setAttribute('x1', adjustedPixel);
-          line.setAttribute('y1', 50);
-          line.setAttribute('x2', adjustedPixel);
-          line.setAttribute('y2', CANVAS_HEIGHT - 50);
-          line.setAttribute('stroke', '#D0D0D0');
-          line.setAttribute('stroke-width', '1');
-          line.setAttribute('opacity', '0.6');
-          svg.appendChild(line);
-        }
+    calendarDividers.forEach(divider => {
+      // Calculate position relative to current view
+      const adjustedPixel = divider.absolute_x - translateX;
+      
+      if (adjustedPixel >= -50 && adjustedPixel <= CANVAS_WIDTH + 50) {
+        const line = document.createElementNS('http://www.w3.org/2000/svg', 'line');
+        line.setAttribute('x1', adjustedPixel);
+        line.setAttribute('y1', 50);
+        line.setAttribute('x2', adjustedPixel);
+        line.setAttribute('y2', CANVAS_HEIGHT - 50);
+        line.setAttribute('stroke', '#D0D0D0');
+        line.setAttribute('stroke-width', '1');
+        line.setAttribute('opacity', '0.6');
+        svg.appendChild(line);
       }
-    }
+    });
   };
 
   // Draw wave dividers (quadrant separators)
@@ -763,9 +753,29 @@ const ProfessionalWaveCanvas = ({
     isDragging.current = false;
   };
 
+  // Load month dividers for the years around the current date
+  const dividerYear = currentDate.getFullYear();
+  useEffect(() => {
+    if (activeTimeframe !== 'Solar Year' || !lineSettings.monthlyDividers) {
+      setCalendarDividers([]);
+      return;
+    }
+    
+    let cancelled = false;
+    const loadDividers = async () => {
+      const startDate = `${dividerYear - 2}-01-01T00:00:00Z`;
+      const data = await ApiService.getCalendarDividers(activeTimeframe, startDate, 8 * 366, 'month');
+      if (!cancelled) {
+        setCalendarDividers(data?.dividers || []);
+      }
+    };
+    loadDividers();
+    return () => { cancelled = true; };
+  }, [activeTimeframe, dividerYear, lineSettings.monthlyDividers]);
+
   useEffect(() => {
     drawProfessionalWave();
-  }, [activeTimeframe, currentDate, translateX, selectedCycles, lineSettings, mousePosition]);
+  }, [activeTimeframe, currentDate, translateX, selectedCycles, lineSettings, mousePosition, calendarDividers]);
 
   return (
     <div className="professional-wave-container">
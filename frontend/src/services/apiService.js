@@ -87,6 +87,46 @@ class ApiService {
     }
   }
 
+  // Get calendar year/month/week dividers mapped to cycle pixels
+  static async getCalendarDividers(cycleName, startDate = null, days = 365, kinds = 'year,month,week') {
+    try {
+      const params = new URLSearchParams();
+      if (startDate) params.append('start_date', startDate);
+      params.append('days', days.toString());
+      params.append('kinds', kinds);
+      
+      const response = await fetch(`${API}/calendar_dividers/${cycleName.toLowerCase().replace(' ', '_')}?${params}`);
+      if (!response.ok) {
+        throw new Error('Failed to fetch calendar dividers');
+      }
+      return await response.json();
+    } catch (error) {
+      console.error('Error fetching calendar dividers:', error);
+      return null;
+    }
+  }
+
+  // Score a grid of candidate cycle parameters against reference dates
+  static async sweepCycleParameters(sweepRequest) {
+    try {
+      const response = await fetch(`${API}/sweep`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(sweepRequest)
+      });
+      
+      if (!response.ok) {
+        throw new Error('Failed to sweep cycle parameters');
+      }
+      return await response.json();
+    } catch (error) {
+      console.error('Error sweeping cycle parameters:', error);
+      return null;
+    }
+  }
+
   // Create custom cycle
   static async createCustomCycle(cycleData) {
     try {